@@ -5,10 +5,19 @@ Azure AI Search Service for Invoice Management
 This module handles Azure AI Search operations for indexing and searching invoices.
 """
 
+import atexit
 from datetime import datetime
 from typing import Dict, List
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
+
+try:
+    from azure.search.documents import SearchIndexingBufferedSender
+
+    BUFFERED_SENDER_AVAILABLE = True
+except ImportError:
+    SearchIndexingBufferedSender = None
+    BUFFERED_SENDER_AVAILABLE = False
 from azure.search.documents.indexes.models import (
     SearchIndex,
     SearchFieldDataType,
@@ -45,6 +54,28 @@ class AzureSearchService:
 
             # Create index if it doesn't exist
             self._create_invoice_index()
+
+            # Buffered sender batches document uploads and retries with
+            # backoff, amortizing HTTP/TLS/auth overhead across many
+            # invoices instead of one round trip per document
+            self.buffered_sender = None
+            if BUFFERED_SENDER_AVAILABLE:
+                try:
+                    self.buffered_sender = SearchIndexingBufferedSender(
+                        endpoint=config.SEARCH_ENDPOINT,
+                        index_name=config.SEARCH_INDEX_NAME,
+                        credential=credential,
+                        auto_flush_interval=5,
+                        initial_batch_action_count=1000,
+                        on_error=self._on_buffered_index_error,
+                    )
+                    # Flush anything still buffered when the process
+                    # exits, otherwise documents inside the auto-flush
+                    # window are silently dropped
+                    atexit.register(self.close)
+                except Exception as e:
+                    print(f"Buffered sender unavailable, using direct uploads: {e}")
+
             self.available = True
 
         except Exception as e:
@@ -52,6 +83,7 @@ class AzureSearchService:
             print("System will continue with limited search functionality")
             self.search_client = None
             self.index_client = None
+            self.buffered_sender = None
             self.available = False
 
     def _create_invoice_index(self):
@@ -170,34 +202,7 @@ class AzureSearchService:
             return False
 
         try:
-            # Prepare search document
-            search_doc = {
-                "id": invoice_data.get("invoice_number"),
-                "invoice_number": invoice_data.get("invoice_number"),
-                "invoice_date": self._parse_date(invoice_data.get("invoice_date")),
-                "due_date": self._parse_date(invoice_data.get("due_date")),
-                "status": "active",
-                "total_amount": invoice_data.get("total", 0),
-                "currency": invoice_data.get("currency", "USD"),
-                # Client information
-                "client_name": invoice_data.get("client", {}).get("name", ""),
-                "client_address": invoice_data.get("client", {}).get("address", ""),
-                "client_contact": invoice_data.get("client", {}).get("contact", ""),
-                # Line items as searchable text
-                "line_items_text": self._format_line_items(
-                    invoice_data.get("line_items", [])
-                ),
-                # Full content for search
-                "content": self._create_search_content(invoice_data),
-                # Metadata
-                "created_date": datetime.utcnow().isoformat(),
-                "modified_date": datetime.utcnow().isoformat(),
-                # File information
-                "file_path": file_path or "",
-                "file_size": 0,  # Will be updated if file exists
-                # Tags
-                "tags": self._generate_tags(invoice_data),
-            }
+            search_doc = self._build_search_document(invoice_data, file_path)
 
             # Upload document to search index
             result = self.search_client.upload_documents([search_doc])
@@ -215,6 +220,96 @@ class AzureSearchService:
             print(f"Error indexing invoice: {e}")
             return False
 
+    def index_invoice_buffered(self, invoice_data: Dict, file_path: str = None) -> bool:
+        """
+        Queue an invoice for batched indexing.
+
+        Documents are handed to the buffered sender, which batches them
+        and flushes every few seconds (or when the batch fills) with
+        automatic retry/backoff - one round trip per batch instead of
+        per invoice. Falls back to the direct upload path when the
+        sender is unavailable.
+
+        Args:
+            invoice_data (Dict): Invoice data to index
+            file_path (str): Optional file path for the generated PDF
+
+        Returns:
+            bool: True if the document was queued (or uploaded), False otherwise
+        """
+        if not self.buffered_sender:
+            return self.index_invoice(invoice_data, file_path)
+
+        try:
+            search_doc = self._build_search_document(invoice_data, file_path)
+            self.buffered_sender.upload_documents([search_doc])
+            return True
+
+        except Exception as e:
+            print(f"Error queueing invoice for indexing: {e}")
+            return False
+
+    @staticmethod
+    def _on_buffered_index_error(action):
+        """Log a document the buffered sender gave up on.
+
+        index_invoice_buffered returns True when a document is queued,
+        so a failure after the sender's internal retries would
+        otherwise vanish silently.
+        """
+        try:
+            key = action.additional_properties.get("id")
+        except AttributeError:
+            key = None
+        print(f"❌ Buffered indexing failed for document: {key or action}")
+
+    def flush_index_buffer(self):
+        """Flush any queued documents to the index."""
+        if self.buffered_sender:
+            try:
+                self.buffered_sender.flush()
+            except Exception as e:
+                print(f"Error flushing index buffer: {e}")
+
+    def close(self):
+        """Flush pending documents and release the buffered sender."""
+        if self.buffered_sender:
+            try:
+                self.buffered_sender.close()
+            except Exception as e:
+                print(f"Error closing buffered sender: {e}")
+            self.buffered_sender = None
+
+    def _build_search_document(self, invoice_data: Dict, file_path: str = None) -> Dict:
+        """Build the search index document for an invoice."""
+        return {
+            "id": invoice_data.get("invoice_number"),
+            "invoice_number": invoice_data.get("invoice_number"),
+            "invoice_date": self._parse_date(invoice_data.get("invoice_date")),
+            "due_date": self._parse_date(invoice_data.get("due_date")),
+            "status": "active",
+            "total_amount": invoice_data.get("total", 0),
+            "currency": invoice_data.get("currency", "USD"),
+            # Client information
+            "client_name": invoice_data.get("client", {}).get("name", ""),
+            "client_address": invoice_data.get("client", {}).get("address", ""),
+            "client_contact": invoice_data.get("client", {}).get("contact", ""),
+            # Line items as searchable text
+            "line_items_text": self._format_line_items(
+                invoice_data.get("line_items", [])
+            ),
+            # Full content for search
+            "content": self._create_search_content(invoice_data),
+            # Metadata
+            "created_date": datetime.utcnow().isoformat(),
+            "modified_date": datetime.utcnow().isoformat(),
+            # File information
+            "file_path": file_path or "",
+            "file_size": 0,  # Will be updated if file exists
+            # Tags
+            "tags": self._generate_tags(invoice_data),
+        }
+
     def search_invoices(
         self, query: str, filters: str = None, top: int = 50
     ) -> List[Dict]:
@@ -0,0 +1,108 @@
+"""
+Monitoring Aggregation Kernels
+==============================
+
+Numeric helpers backing PerformanceMonitor's health-score and alert
+aggregation. The kernels are written loop-style so the exact same bodies
+run either compiled under Numba (when installed) or as plain Python,
+keeping the monitoring path dependency-free.
+"""
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when Numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+
+        def wrap(func):
+            return func
+
+        return wrap
+
+
+def as_float_array(values):
+    """Convert a sequence of numbers to the kernels' input format."""
+    if NUMPY_AVAILABLE:
+        return np.asarray(values, dtype=np.float64)
+    return [float(v) for v in values]
+
+
+@njit(cache=True)
+def health_component_scores(
+    avg_duration,
+    error_rate,
+    hit_rates,
+    response_time_threshold,
+    error_rate_threshold,
+):
+    """Compute (response_time, error_rate, cache_performance) scores."""
+    response_score = 100.0
+    if avg_duration > 0.0:
+        response_score = max(
+            0.0, 100.0 - (avg_duration / response_time_threshold * 50.0)
+        )
+
+    error_score = max(0.0, 100.0 - (error_rate / error_rate_threshold * 20.0))
+
+    cache_score = 100.0
+    n = len(hit_rates)
+    if n > 0:
+        total = 0.0
+        for i in range(n):
+            total += hit_rates[i]
+        cache_score = min(100.0, total / n)
+
+    return response_score, error_score, cache_score
+
+
+@njit(cache=True)
+def recent_window_stats(durations, timestamps, error_flags, cutoff):
+    """Single-pass stats over samples newer than cutoff.
+
+    Returns (count, total_duration, max_duration, min_duration, errors)
+    for the samples whose epoch timestamp is greater than cutoff.
+    """
+    count = 0
+    total = 0.0
+    max_duration = 0.0
+    min_duration = 0.0
+    errors = 0
+    for i in range(len(durations)):
+        if timestamps[i] > cutoff:
+            d = durations[i]
+            total += d
+            if count == 0 or d > max_duration:
+                max_duration = d
+            if count == 0 or d < min_duration:
+                min_duration = d
+            count += 1
+            if error_flags[i] != 0.0:
+                errors += 1
+    return count, total, max_duration, min_duration, errors
+
+
+@njit(cache=True)
+def below_threshold_mask(values, threshold):
+    """Return a 0/1 mask marking values strictly below threshold."""
+    n = len(values)
+    if NUMPY_AVAILABLE:
+        mask = np.zeros(n, dtype=np.uint8)
+    else:
+        mask = [0] * n
+    for i in range(n):
+        if values[i] < threshold:
+            mask[i] = 1
+    return mask
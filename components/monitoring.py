@@ -6,13 +6,22 @@ Provides comprehensive monitoring with Prometheus metrics, performance tracking,
 and business intelligence metrics collection.
 """
 
+import logging
 import time
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, List, Callable
-from dataclasses import dataclass, asdict
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Callable, Optional
+from dataclasses import dataclass, field
 from functools import wraps
 
+from components._monitoring_kernels import (
+    as_float_array,
+    below_threshold_mask,
+    health_component_scores,
+    recent_window_stats,
+)
+
 try:
     from prometheus_client import (
         Counter,
@@ -22,6 +31,7 @@ try:
         CollectorRegistry,
         generate_latest,
     )
+    from prometheus_client.core import CounterMetricFamily
 
     PROMETHEUS_AVAILABLE = True
 except ImportError:
@@ -29,7 +39,60 @@ except ImportError:
     print("⚠️ Prometheus client not available - metrics collection will be limited")
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+class _RateLimitedLog:
+    """Rate-limits warning emission per call site.
+
+    Under a failure storm the old print()-per-error pattern serialized the
+    collection loop on the stdout lock; this caps each site to one warning
+    per interval and uses lazy %-formatting.
+    """
+
+    def __init__(self, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._last_emit = {}
+
+    def warning(self, site: str, msg: str, *args):
+        now = time.monotonic()
+        if now - self._last_emit.get(site, 0.0) < self.min_interval:
+            return
+        self._last_emit[site] = now
+        logger.warning(msg, *args)
+
+
+_warn = _RateLimitedLog()
+
+
+class _CacheStatsCollector:
+    """Synthesizes cache hit/miss counters from cache_stats at scrape time.
+
+    Keeps the in-memory dict as the single source of truth so the hot
+    record path does one dict update instead of also incrementing
+    prometheus_client counters.
+    """
+
+    def __init__(self, performance_data: Dict):
+        self._performance_data = performance_data
+
+    def collect(self):
+        hits = CounterMetricFamily(
+            "cache_hits", "Total cache hits", labels=["cache_type"]
+        )
+        misses = CounterMetricFamily(
+            "cache_misses", "Total cache misses", labels=["cache_type"]
+        )
+
+        for cache_type, stats in self._performance_data["cache_stats"].items():
+            hits.add_metric([cache_type], stats["hits"])
+            misses.add_metric([cache_type], stats["misses"])
+
+        yield hits
+        yield misses
+
+
+@dataclass(slots=True)
 class MetricEvent:
     """Represents a metric event."""
 
@@ -38,16 +101,19 @@ class MetricEvent:
     labels: Dict[str, str]
     timestamp: datetime
     metric_type: str  # counter, gauge, histogram, summary
+    _cached_dict: Optional[Dict] = field(default=None, repr=False, compare=False)
 
     def to_dict(self) -> Dict:
-        """Convert to dictionary."""
-        return {
-            "name": self.name,
-            "value": self.value,
-            "labels": self.labels,
-            "timestamp": self.timestamp.isoformat(),
-            "metric_type": self.metric_type,
-        }
+        """Convert to dictionary (built once, reused on repeat calls)."""
+        if self._cached_dict is None:
+            self._cached_dict = {
+                "name": self.name,
+                "value": self.value,
+                "labels": self.labels,
+                "timestamp": self.timestamp.isoformat(),
+                "metric_type": self.metric_type,
+            }
+        return self._cached_dict
 
 
 class MetricsCollector:
@@ -60,20 +126,31 @@ class MetricsCollector:
         self.custom_metrics = []
         self.callbacks: List[Callable] = []
 
-        # Initialize core metrics
-        self._initialize_core_metrics()
-
-        # Performance tracking
+        # Performance tracking (cache_stats must exist before the scrape
+        # collector is registered against it)
         self.performance_data = {
-            "request_times": [],
             "error_counts": {},
             "cache_stats": {},
             "system_stats": {},
         }
 
+        # Initialize core metrics
+        self._initialize_core_metrics()
+
+        # Per-function circular buffers (durations, epoch timestamps,
+        # statuses) so summaries only touch the samples they need and the
+        # maxlen bound replaces the old list-slicing trim.
+        self._func_times: Dict[str, tuple] = {}
+
+        # Cached per-currency revenue gauge children (label resolution
+        # walks prometheus_client's lock-guarded label cache, so do it
+        # once per currency)
+        self._revenue_children = {}
+
         # Background collection
         self.collection_thread = None
         self.is_collecting = False
+        self._stop_event = threading.Event()
 
     def _initialize_core_metrics(self):
         """Initialize core application metrics."""
@@ -109,20 +186,9 @@ class MetricsCollector:
             registry=self.registry,
         )
 
-        # Cache metrics
-        self.metrics["cache_hits_total"] = Counter(
-            "cache_hits_total",
-            "Total cache hits",
-            ["cache_type"],
-            registry=self.registry,
-        )
-
-        self.metrics["cache_misses_total"] = Counter(
-            "cache_misses_total",
-            "Total cache misses",
-            ["cache_type"],
-            registry=self.registry,
-        )
+        # Cache metrics are synthesized at scrape time from the in-memory
+        # cache_stats dict so hits/misses are only accounted once.
+        self.registry.register(_CacheStatsCollector(self.performance_data))
 
         # Service health metrics
         self.metrics["service_availability"] = Gauge(
@@ -204,9 +270,6 @@ class MetricsCollector:
 
     def record_cache_hit(self, cache_type: str):
         """Record cache hit."""
-        if PROMETHEUS_AVAILABLE:
-            self.metrics["cache_hits_total"].labels(cache_type=cache_type).inc()
-
         if cache_type not in self.performance_data["cache_stats"]:
             self.performance_data["cache_stats"][cache_type] = {"hits": 0, "misses": 0}
 
@@ -214,9 +277,6 @@ class MetricsCollector:
 
     def record_cache_miss(self, cache_type: str):
         """Record cache miss."""
-        if PROMETHEUS_AVAILABLE:
-            self.metrics["cache_misses_total"].labels(cache_type=cache_type).inc()
-
         if cache_type not in self.performance_data["cache_stats"]:
             self.performance_data["cache_stats"][cache_type] = {"hits": 0, "misses": 0}
 
@@ -232,8 +292,12 @@ class MetricsCollector:
     def record_business_metrics(self, revenue_data: Dict, outstanding_invoices: int):
         """Record business metrics."""
         if PROMETHEUS_AVAILABLE:
-            for currency, amount in revenue_data.items():
-                self.metrics["revenue_total"].labels(currency=currency).set(amount)
+            for currency in sorted(revenue_data):
+                child = self._revenue_children.get(currency)
+                if child is None:
+                    child = self.metrics["revenue_total"].labels(currency=currency)
+                    self._revenue_children[currency] = child
+                child.set(revenue_data[currency])
 
             self.metrics["invoices_outstanding"].set(outstanding_invoices)
 
@@ -249,6 +313,11 @@ class MetricsCollector:
         """Decorator to time function execution."""
 
         def decorator(func):
+            # Precompute both label variants once so the hot path does not
+            # allocate (or mutate) a labels dict per call.
+            success_labels = dict(labels or {}, status="success")
+            error_labels = dict(labels or {}, status="error")
+
             @wraps(func)
             def wrapper(*args, **kwargs):
                 start_time = time.time()
@@ -261,40 +330,37 @@ class MetricsCollector:
                     status = "error"
                     raise
                 finally:
-                    duration = time.time() - start_time
+                    now = datetime.now()
+                    end_time = time.time()
+                    duration = end_time - start_time
 
                     # Record timing metric
-                    metric_labels = labels or {}
-                    metric_labels["status"] = status
+                    metric_labels = (
+                        success_labels if status == "success" else error_labels
+                    )
 
                     self.custom_metrics.append(
                         MetricEvent(
                             name=metric_name,
                             value=duration,
                             labels=metric_labels,
-                            timestamp=datetime.now(),
+                            timestamp=now,
                             metric_type="histogram",
                         )
                     )
 
-                    # Store in performance data
-                    if metric_name not in self.performance_data["request_times"]:
-                        self.performance_data["request_times"] = []
-
-                    self.performance_data["request_times"].append(
-                        {
-                            "function": func.__name__,
-                            "duration": duration,
-                            "status": status,
-                            "timestamp": datetime.now().isoformat(),
-                        }
+                    # Store in the per-function circular buffers
+                    durations, timestamps, error_flags = self._func_times.setdefault(
+                        func.__name__,
+                        (
+                            deque(maxlen=1000),
+                            deque(maxlen=1000),
+                            deque(maxlen=1000),
+                        ),
                     )
-
-                    # Keep only last 1000 entries
-                    if len(self.performance_data["request_times"]) > 1000:
-                        self.performance_data["request_times"] = self.performance_data[
-                            "request_times"
-                        ][-1000:]
+                    durations.append(duration)
+                    timestamps.append(end_time)
+                    error_flags.append(1.0 if status == "error" else 0.0)
 
             return wrapper
 
@@ -310,19 +376,30 @@ class MetricsCollector:
             try:
                 callback(metric_name, data)
             except Exception as e:
-                print(f"Error in metrics callback: {e}")
+                _warn.warning("callback", "Metrics callback failed: %s", e)
 
-    def get_prometheus_metrics(self) -> str:
-        """Get Prometheus-formatted metrics."""
+    def get_prometheus_metrics_bytes(self) -> bytes:
+        """Get Prometheus-formatted metrics as wire-format bytes.
+
+        Scrape endpoints should serve this directly (with
+        Content-Type: text/plain; version=0.0.4; charset=utf-8) to avoid
+        a decode/re-encode round trip over a payload that can reach
+        hundreds of KB.
+        """
         if not PROMETHEUS_AVAILABLE or not self.registry:
-            return "# Prometheus not available\n"
+            return b"# Prometheus not available\n"
 
-        return generate_latest(self.registry).decode("utf-8")
+        return generate_latest(self.registry)
+
+    def get_prometheus_metrics(self) -> str:
+        """Get Prometheus-formatted metrics as text (back-compat wrapper)."""
+        return self.get_prometheus_metrics_bytes().decode("utf-8")
 
     def get_performance_summary(self) -> Dict:
         """Get performance summary."""
+        now = datetime.now()
         summary = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "cache_performance": {},
             "request_performance": {},
             "error_rates": {},
@@ -343,27 +420,41 @@ class MetricsCollector:
                 "misses": stats["misses"],
             }
 
-        # Request performance
-        recent_requests = [
-            req
-            for req in self.performance_data["request_times"]
-            if datetime.fromisoformat(req["timestamp"])
-            > datetime.now() - timedelta(minutes=5)
-        ]
-
-        if recent_requests:
-            durations = [req["duration"] for req in recent_requests]
+        # Request performance (single-pass kernel over each function's
+        # buffers, no ISO parsing)
+        cutoff = time.time() - 300
+        total_count = 0
+        total_duration = 0.0
+        max_duration = 0.0
+        min_duration = 0.0
+        error_count = 0
+        for durations, timestamps, error_flags in self._func_times.values():
+            count, total, func_max, func_min, errors = recent_window_stats(
+                as_float_array(durations),
+                as_float_array(timestamps),
+                as_float_array(error_flags),
+                cutoff,
+            )
+            if count == 0:
+                continue
+            if total_count == 0 or func_max > max_duration:
+                max_duration = func_max
+            if total_count == 0 or func_min < min_duration:
+                min_duration = func_min
+            total_count += count
+            total_duration += total
+            error_count += errors
+
+        if total_count:
             summary["request_performance"] = {
-                "avg_duration": round(sum(durations) / len(durations), 3),
-                "max_duration": round(max(durations), 3),
-                "min_duration": round(min(durations), 3),
-                "total_requests": len(recent_requests),
+                "avg_duration": round(total_duration / total_count, 3),
+                "max_duration": round(max_duration, 3),
+                "min_duration": round(min_duration, 3),
+                "total_requests": total_count,
             }
 
-        # Error rates
-        error_requests = [req for req in recent_requests if req["status"] == "error"]
-        if recent_requests:
-            error_rate = len(error_requests) / len(recent_requests) * 100
+            # Error rates
+            error_rate = error_count / total_count * 100
             summary["error_rates"]["last_5_minutes"] = round(error_rate, 2)
 
         # System health
@@ -377,6 +468,7 @@ class MetricsCollector:
             return
 
         self.is_collecting = True
+        self._stop_event.clear()
         self.collection_thread = threading.Thread(
             target=self._collection_loop, args=(interval,), daemon=True
         )
@@ -386,19 +478,23 @@ class MetricsCollector:
     def stop_background_collection(self):
         """Stop background metrics collection."""
         self.is_collecting = False
+        self._stop_event.set()
         if self.collection_thread:
             self.collection_thread.join(timeout=5)
         print("🛑 Stopped background metrics collection")
 
     def _collection_loop(self, interval: int):
         """Background collection loop."""
-        while self.is_collecting:
+        while not self._stop_event.is_set():
             try:
                 self._collect_system_metrics()
-                time.sleep(interval)
             except Exception as e:
-                print(f"Error in metrics collection: {e}")
-                time.sleep(interval)
+                _warn.warning("collection_loop", "Error in metrics collection: %s", e)
+
+            # Event.wait returns True as soon as stop is requested, so
+            # shutdown does not block for up to a full interval.
+            if self._stop_event.wait(interval):
+                break
 
     def _collect_system_metrics(self):
         """Collect system-wide metrics."""
@@ -442,7 +538,9 @@ class MetricsCollector:
                     self.metrics["invoices_outstanding"].set(outstanding)
 
             except Exception as e:
-                print(f"Error collecting business metrics: {e}")
+                _warn.warning(
+                    "business_metrics", "Error collecting business metrics: %s", e
+                )
 
             # Queue metrics if available
             try:
@@ -461,7 +559,9 @@ class MetricsCollector:
                 pass  # Queue not available
 
         except Exception as e:
-            print(f"Error in system metrics collection: {e}")
+            _warn.warning(
+                "system_metrics", "Error in system metrics collection: %s", e
+            )
 
 
 class PerformanceMonitor:
@@ -470,7 +570,7 @@ class PerformanceMonitor:
     def __init__(self, metrics_collector: MetricsCollector):
         """Initialize performance monitor."""
         self.metrics_collector = metrics_collector
-        self.alerts = []
+        self.alerts = deque(maxlen=5000)
         self.thresholds = {
             "response_time": 2.0,  # seconds
             "error_rate": 5.0,  # percentage
@@ -482,6 +582,7 @@ class PerformanceMonitor:
         """Check for performance issues and generate alerts."""
         alerts = []
         summary = self.metrics_collector.get_performance_summary()
+        now_ts = time.time()
 
         # Check response time
         request_perf = summary.get("request_performance", {})
@@ -495,7 +596,7 @@ class PerformanceMonitor:
                     "message": f"High average response time: {avg_duration:.2f}s",
                     "threshold": self.thresholds["response_time"],
                     "current_value": avg_duration,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_ts,
                 }
             )
 
@@ -510,26 +611,34 @@ class PerformanceMonitor:
                     "message": f"High error rate: {error_rate:.1f}%",
                     "threshold": self.thresholds["error_rate"],
                     "current_value": error_rate,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_ts,
                 }
             )
 
-        # Check cache performance
+        # Check cache performance (comparison runs in the compiled kernel)
         cache_perf = summary.get("cache_performance", {})
-        for cache_type, stats in cache_perf.items():
-            hit_rate = stats.get("hit_rate", 0)
-
-            if hit_rate < self.thresholds["cache_hit_rate"]:
-                alerts.append(
-                    {
-                        "type": "cache_performance",
-                        "severity": "warning",
-                        "message": f"Low cache hit rate for {cache_type}: {hit_rate:.1f}%",
-                        "threshold": self.thresholds["cache_hit_rate"],
-                        "current_value": hit_rate,
-                        "timestamp": datetime.now().isoformat(),
-                    }
-                )
+        cache_types = list(cache_perf.keys())
+        hit_rates = as_float_array(
+            [cache_perf[cache_type].get("hit_rate", 0) for cache_type in cache_types]
+        )
+        breaches = below_threshold_mask(hit_rates, self.thresholds["cache_hit_rate"])
+
+        for i, breached in enumerate(breaches):
+            if not breached:
+                continue
+
+            cache_type = cache_types[i]
+            hit_rate = float(hit_rates[i])
+            alerts.append(
+                {
+                    "type": "cache_performance",
+                    "severity": "warning",
+                    "message": f"Low cache hit rate for {cache_type}: {hit_rate:.1f}%",
+                    "threshold": self.thresholds["cache_hit_rate"],
+                    "current_value": hit_rate,
+                    "timestamp": now_ts,
+                }
+            )
 
         # Check queue size
         system_health = summary.get("system_health", {})
@@ -544,20 +653,18 @@ class PerformanceMonitor:
                     "message": f"Large queue size: {queue_size} jobs",
                     "threshold": self.thresholds["queue_size"],
                     "current_value": queue_size,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": now_ts,
                 }
             )
 
         # Store alerts
         self.alerts.extend(alerts)
 
-        # Keep only recent alerts (last 24 hours)
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        self.alerts = [
-            alert
-            for alert in self.alerts
-            if datetime.fromisoformat(alert["timestamp"]) > cutoff_time
-        ]
+        # Keep only recent alerts (last 24 hours); entries are appended in
+        # time order, so expiry is O(1) pops from the left.
+        cutoff_time = now_ts - 86400
+        while self.alerts and self.alerts[0]["timestamp"] < cutoff_time:
+            self.alerts.popleft()
 
         return alerts
 
@@ -565,33 +672,27 @@ class PerformanceMonitor:
         """Calculate overall system health score."""
         summary = self.metrics_collector.get_performance_summary()
 
-        scores = {
-            "response_time": 100,
-            "error_rate": 100,
-            "cache_performance": 100,
-            "system_availability": 100,
-        }
-
-        # Response time score
+        # Component scores are computed in the compiled kernel
         avg_duration = summary.get("request_performance", {}).get("avg_duration", 0)
-        if avg_duration > 0:
-            scores["response_time"] = max(
-                0, 100 - (avg_duration / self.thresholds["response_time"] * 50)
-            )
-
-        # Error rate score
         error_rate = summary.get("error_rates", {}).get("last_5_minutes", 0)
-        scores["error_rate"] = max(
-            0, 100 - (error_rate / self.thresholds["error_rate"] * 20)
+        hit_rates = as_float_array(
+            [stats["hit_rate"] for stats in summary.get("cache_performance", {}).values()]
         )
 
-        # Cache performance score
-        cache_perf = summary.get("cache_performance", {})
-        if cache_perf:
-            avg_hit_rate = sum(
-                stats["hit_rate"] for stats in cache_perf.values()
-            ) / len(cache_perf)
-            scores["cache_performance"] = min(100, avg_hit_rate)
+        response_score, error_score, cache_score = health_component_scores(
+            float(avg_duration),
+            float(error_rate),
+            hit_rates,
+            self.thresholds["response_time"],
+            self.thresholds["error_rate"],
+        )
+
+        scores = {
+            "response_time": response_score,
+            "error_rate": error_score,
+            "cache_performance": cache_score,
+            "system_availability": 100,
+        }
 
         # Overall health score
         overall_score = sum(scores.values()) / len(scores)
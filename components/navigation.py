@@ -5,134 +5,197 @@ Navigation Component for Invoice Management Dashboard
 Handles sidebar navigation and page routing.
 """
 
+import time
+
 import streamlit as st
 from datetime import datetime
 from typing import Dict, Any
 
 
+@st.cache_resource
+def _sidebar_header_html() -> str:
+    """Static sidebar header markup, built once per server process."""
+    return """
+        <div class="nav-container">
+            <div class="nav-title">🤖 Invoice AI Assistant</div>
+        </div>
+        """
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_statistics(_service_manager) -> Dict[str, Any]:
+    """Fetch business statistics at most once per 30s across reruns."""
+    return _service_manager.get_statistics()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_cache_statistics(_service_manager) -> Dict[str, Any]:
+    """Fetch cache statistics at most once per 30s across reruns."""
+    return _service_manager.get_cache_statistics()
+
+
 class NavigationComponent:
     """Handles navigation and sidebar functionality."""
 
+    # Sidebar pages: (label, page id), in display order
+    _pages = (
+        ("💬 Chat Assistant", "Chat"),
+        ("📊 Analytics Dashboard", "Analytics"),
+        ("📝 Quick Invoice", "Quick Invoice"),
+        ("🔧 System Status", "System Status"),
+    )
+    _page_labels = tuple(label for label, _ in _pages)
+    _label_to_page = dict(_pages)
+    _page_to_index = {page: i for i, (_, page) in enumerate(_pages)}
+
+    # AI shortcut labels and the chat queries they enqueue
+    _SHORTCUT_QUERIES = {
+        "📊 Show Statistics": "show me my business statistics",
+        "🔍 Find Recent Invoices": "show me recent invoices from the last 30 days",
+        "💰 Outstanding Balance": "what's my total outstanding balance?",
+        "📈 Business Insights": "give me insights about my business performance",
+        "🔧 System Health": "check my system status and performance",
+    }
+    _SHORTCUT_LABELS = tuple(_SHORTCUT_QUERIES)
+
     def __init__(self, service_manager):
         """Initialize navigation component."""
         self.service_manager = service_manager
+        self._refresh_clock()
+
+    def _refresh_clock(self):
+        """Capture one timestamp per render scope.
+
+        Sections run as fragments, so each rerun scope takes the clock
+        once and every notification, caption, and filename within it
+        shares a consistent timestamp.
+        """
+        self._now = datetime.now()
+        self._now_stamp = self._now.strftime("%Y%m%d_%H%M%S")
 
     def render_sidebar(self) -> str:
         """Render the navigation sidebar and return selected page."""
+        self._refresh_clock()
         with st.sidebar:
             # Header
-            st.markdown(
-                """
-                <div class="nav-container">
-                    <div class="nav-title">🤖 Invoice AI Assistant</div>
-                </div>
-                """,
-                unsafe_allow_html=True,
-            )
+            st.markdown(_sidebar_header_html(), unsafe_allow_html=True)
 
             # Navigation Menu
             st.markdown("### 📋 Navigation")
 
             # Page selection
-            pages = {
-                "💬 Chat Assistant": "Chat",
-                "📊 Analytics Dashboard": "Analytics",
-                "📝 Quick Invoice": "Quick Invoice",
-                "🔧 System Status": "System Status",
-            }
-
             current_page = st.session_state.get("current_page", "Chat")
             selected_page = st.radio(
                 "Select Page",
-                options=list(pages.keys()),
-                index=list(pages.values()).index(current_page),
+                options=self._page_labels,
+                index=self._page_to_index.get(current_page, 0),
                 label_visibility="collapsed",
             )
 
             # Update session state
-            st.session_state.current_page = pages[selected_page]
-
-            st.markdown("---")
-
-            # AI Shortcut Buttons
-            self._render_ai_shortcuts()
-
-            st.markdown("---")
-
-            # Download Center
-            self._render_download_center()
+            page = self._label_to_page[selected_page]
+            st.session_state.current_page = page
+
+            # Compact mode skips the heavy sections entirely — their
+            # widgets still execute server-side when rendered, collapsed
+            # browser panel or not
+            st.session_state.sidebar_collapsed = st.toggle(
+                "Compact sidebar",
+                value=st.session_state.get("sidebar_collapsed", False),
+                help="Hide shortcuts, downloads and stats for faster reruns",
+                key="nav_sidebar_compact",
+            )
 
-            st.markdown("---")
+            if not st.session_state.sidebar_collapsed:
+                # AI Shortcut Buttons
+                self._render_ai_shortcuts()
 
-            # Quick Stats
-            self._render_sidebar_stats()
+                # Download Center
+                self._render_download_center()
 
-            st.markdown("---")
+                # Quick Stats
+                self._render_sidebar_stats()
 
             # System Controls
             self._render_system_controls()
 
-            return pages[selected_page]
+            return page
 
+    @st.fragment
     def _render_ai_shortcuts(self):
         """Render AI shortcut buttons in sidebar."""
-        st.markdown("### 🤖 AI Shortcuts")
-
-        # Quick AI actions
-        if st.button("📊 Show Statistics", key="ai_stats", use_container_width=True):
-            self._handle_ai_shortcut("show me my business statistics")
-
-        if st.button(
-            "🔍 Find Recent Invoices", key="ai_recent", use_container_width=True
-        ):
-            self._handle_ai_shortcut("show me recent invoices from the last 30 days")
-
-        if st.button(
-            "💰 Outstanding Balance", key="ai_balance", use_container_width=True
-        ):
-            self._handle_ai_shortcut("what's my total outstanding balance?")
-
-        if st.button(
-            "📈 Business Insights", key="ai_insights", use_container_width=True
-        ):
-            self._handle_ai_shortcut("give me insights about my business performance")
-
-        if st.button("🔧 System Health", key="ai_health", use_container_width=True):
-            self._handle_ai_shortcut("check my system status and performance")
+        st.markdown("---\n### 🤖 AI Shortcuts")
+
+        # One selectbox + run button instead of five separate buttons:
+        # two widgets to register and sync per rerun instead of five.
+        # The callback runs before the rerun starts, so state is mutated
+        # without costing a second pass.
+        st.selectbox(
+            "AI Shortcut",
+            options=self._SHORTCUT_LABELS,
+            key="ai_shortcut_sel",
+            label_visibility="collapsed",
+        )
+        st.button(
+            "▶️ Run Shortcut",
+            key="ai_shortcut_run",
+            use_container_width=True,
+            on_click=self._run_selected_shortcut,
+        )
 
         # Test Analytics Chat button
-        if st.button(
+        st.button(
             "🧪 Test Analytics Chat",
             key="test_analytics_chat_sidebar",
             use_container_width=True,
-        ):
-            self._handle_test_analytics_chat()
+            on_click=self._handle_test_analytics_chat,
+        )
 
         # Invoice Gallery button
-        if st.button("📁 Invoice Gallery", key="gallery_sidebar", use_container_width=True):
-            self._handle_invoice_gallery()
+        st.button(
+            "📁 Invoice Gallery",
+            key="gallery_sidebar",
+            use_container_width=True,
+            on_click=self._handle_invoice_gallery,
+        )
 
+        # st.rerun is a no-op inside callbacks, so they leave a flag and
+        # the fragment body escalates to the app-scoped rerun that the
+        # page switch needs.
+        if st.session_state.pop("_sidebar_needs_app_rerun", False):
+            st.rerun(scope="app")
+
+    @st.fragment
     def _render_download_center(self):
         """Render download center with various export options."""
-        st.markdown("### 📥 Download Center")
+        self._refresh_clock()
+        st.markdown("---\n### 📥 Download Center")
 
         # Invoice Downloads
         st.markdown("**📄 Invoices**")
         col1, col2 = st.columns(2)
 
         with col1:
-            if st.button(
-                "📋 Invoice List", key="download_invoice_list", use_container_width=True
-            ):
-                self._download_invoice_list()
+            # data= callable defers the fetch + DataFrame build until the
+            # user actually downloads, and drops the old two-click flow
+            st.download_button(
+                "📋 Invoice List",
+                data=self._build_invoice_csv_bytes,
+                file_name=f"invoice_list_{self._now_stamp}.csv",
+                mime="text/csv",
+                key="download_invoice_list",
+                use_container_width=True,
+            )
 
         with col2:
-            if st.button(
+            st.download_button(
                 "📊 Invoice Report",
+                data=self._build_invoice_report_bytes,
+                file_name=f"invoice_report_{self._now_stamp}.html",
+                mime="text/html",
                 key="download_invoice_report",
                 use_container_width=True,
-            ):
-                self._download_invoice_report()
+            )
 
         # Analytics Downloads
         st.markdown("**📈 Analytics**")
@@ -159,74 +222,52 @@ class NavigationComponent:
         ):
             self._download_system_report()
 
-    def _handle_ai_shortcut(self, query: str):
-        """Handle AI shortcut button clicks."""
-        # Add the query to chat messages
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
+    def _enqueue_chat_query(self, query: str, notif_msg: str, notif_type: str = "info"):
+        """Queue a chat query, switch to the chat page, and notify."""
+        now = datetime.now()
 
-        # Add user message
-        st.session_state.messages.append(
-            {"role": "user", "content": query, "timestamp": datetime.now()}
+        # Add the query to chat messages
+        st.session_state.setdefault("messages", []).append(
+            {"role": "user", "content": query, "timestamp": now}
         )
 
         # Switch to chat page
         st.session_state.current_page = "Chat"
 
         # Clear any existing processing flags to ensure fresh processing
-        if hasattr(st.session_state, "processing_message"):
-            del st.session_state.processing_message
+        st.session_state.pop("processing_message", None)
 
         # Add notification
-        if "notification_queue" not in st.session_state:
-            st.session_state.notification_queue = []
-        st.session_state.notification_queue.append(
+        st.session_state.setdefault("notification_queue", []).append(
             {
-                "message": f"🤖 Processing AI query: {query[:50]}...",
-                "type": "info",
-                "timestamp": datetime.now(),
+                "message": notif_msg,
+                "type": notif_type,
+                "timestamp": now,
             }
         )
 
-        # Rerun to process the query
-        st.rerun()
+        # Have the fragment body repaint the whole app on its next run so
+        # the main area follows the page switch.
+        st.session_state._sidebar_needs_app_rerun = True
+
+    def _run_selected_shortcut(self):
+        """Enqueue the selectbox's shortcut (runs as an on_click callback)."""
+        query = self._SHORTCUT_QUERIES.get(st.session_state.get("ai_shortcut_sel"))
+        if query:
+            self._handle_ai_shortcut(query)
+
+    def _handle_ai_shortcut(self, query: str):
+        """Handle AI shortcut invocations (runs as an on_click callback)."""
+        self._enqueue_chat_query(query, f"🤖 Processing AI query: {query[:50]}...")
 
     def _handle_test_analytics_chat(self):
         """Handle test analytics chat functionality."""
         try:
-            # Add a test message to chat
-            if "messages" not in st.session_state:
-                st.session_state.messages = []
-
-            test_message = (
-                "Test message from analytics - show me my business performance"
+            self._enqueue_chat_query(
+                "Test message from analytics - show me my business performance",
+                "🧪 Analytics Chat Test Activated! Processing test query...",
             )
 
-            # Add user message
-            st.session_state.messages.append(
-                {"role": "user", "content": test_message, "timestamp": datetime.now()}
-            )
-
-            # Switch to chat page
-            st.session_state.current_page = "Chat"
-
-            # Clear any existing processing flags
-            if hasattr(st.session_state, "processing_message"):
-                del st.session_state.processing_message
-
-            # Add notification
-            if "notification_queue" not in st.session_state:
-                st.session_state.notification_queue = []
-            st.session_state.notification_queue.append(
-                {
-                    "message": "🧪 Analytics Chat Test Activated! Processing test query...",
-                    "type": "info",
-                    "timestamp": datetime.now(),
-                }
-            )
-
-            st.rerun()
-
         except Exception as e:
             st.error(f"Error activating test analytics chat: {e}")
 
@@ -240,108 +281,70 @@ class NavigationComponent:
             st.session_state.show_invoice_gallery = True
             
             # Add notification
-            if "notification_queue" not in st.session_state:
-                st.session_state.notification_queue = []
-            st.session_state.notification_queue.append(
+            st.session_state.setdefault("notification_queue", []).append(
                 {
                     "message": "📁 Invoice Gallery opened! Browse your generated invoices.",
                     "type": "info",
                     "timestamp": datetime.now(),
                 }
             )
-            
-            st.rerun()
-            
-        except Exception as e:
-            st.error(f"Error opening invoice gallery: {e}")
 
-    def _download_invoice_list(self):
-        """Download invoice list as CSV."""
-        try:
-            import pandas as pd
-            import io
-
-            # Get invoice data
-            invoices = self.service_manager.list_invoices(limit=1000)
-
-            if not invoices:
-                st.warning("No invoices found to download.")
-                return
-
-            # Prepare data for CSV
-            csv_data = []
-            for invoice in invoices:
-                invoice_data = invoice.get("invoice_data", invoice)
-                client = invoice_data.get("client", {})
-
-                csv_data.append(
-                    {
-                        "Invoice Number": invoice_data.get("invoice_number", ""),
-                        "Date": invoice_data.get("invoice_date", ""),
-                        "Client Name": client.get("name", ""),
-                        "Client Email": client.get("email", ""),
-                        "Total": invoice_data.get("total", 0),
-                        "Currency": invoice_data.get("currency", "USD"),
-                        "Status": invoice_data.get("status", ""),
-                        "Payment Terms": invoice_data.get("payment_terms", ""),
-                        "PO Number": invoice_data.get("po_number", ""),
-                    }
-                )
-
-            # Create DataFrame and CSV
-            df = pd.DataFrame(csv_data)
-            csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
-
-            # Provide download
-            st.download_button(
-                label="📥 Download Invoice List CSV",
-                data=csv_buffer.getvalue(),
-                file_name=f"invoice_list_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                key="download_csv_btn",
-            )
-
-            st.success(
-                f"✅ Invoice list prepared! {len(csv_data)} invoices ready for download."
-            )
+            st.session_state._sidebar_needs_app_rerun = True
 
         except Exception as e:
-            st.error(f"❌ Error preparing invoice list: {str(e)}")
-
-    def _download_invoice_report(self):
-        """Download detailed invoice report as HTML."""
-        try:
-            # Get invoice data and statistics
-            invoices = self.service_manager.list_invoices(limit=100)
-            stats = self.service_manager.get_statistics()
-
-            # Generate HTML report
-            html_content = self._generate_invoice_report_html(invoices, stats)
+            st.error(f"Error opening invoice gallery: {e}")
 
-            # Provide download
-            st.download_button(
-                label="📥 Download Invoice Report HTML",
-                data=html_content,
-                file_name=f"invoice_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-                mime="text/html",
-                key="download_report_btn",
-            )
+    def _build_invoice_csv_bytes(self) -> bytes:
+        """Build the invoice-list CSV; runs only when a download starts."""
+        import pandas as pd
+
+        # Get invoice data
+        invoices = self.service_manager.list_invoices(limit=1000)
+
+        # Flatten in pandas C code instead of a per-invoice dict loop
+        records = [invoice.get("invoice_data", invoice) for invoice in invoices]
+        df = pd.json_normalize(records, sep=".")
+
+        columns = {
+            "invoice_number": ("Invoice Number", ""),
+            "invoice_date": ("Date", ""),
+            "client.name": ("Client Name", ""),
+            "client.email": ("Client Email", ""),
+            "total": ("Total", 0),
+            "currency": ("Currency", "USD"),
+            "status": ("Status", ""),
+            "payment_terms": ("Payment Terms", ""),
+            "po_number": ("PO Number", ""),
+        }
+        for column, (_, default) in columns.items():
+            if column not in df.columns:
+                df[column] = default
+            else:
+                df[column] = df[column].fillna(default)
+
+        df = df[list(columns)].rename(
+            columns={column: name for column, (name, _) in columns.items()}
+        )
 
-            st.success("✅ Invoice report prepared for download!")
+        return df.to_csv(index=False).encode("utf-8")
 
-        except Exception as e:
-            st.error(f"❌ Error preparing invoice report: {str(e)}")
+    def _build_invoice_report_bytes(self) -> bytes:
+        """Build the HTML invoice report; runs only when a download starts."""
+        invoices = self.service_manager.list_invoices(limit=100)
+        stats = _cached_statistics(self.service_manager)
+        return self._generate_invoice_report_html(invoices, stats).encode("utf-8")
 
     def _download_statistics_csv(self):
         """Download business statistics as CSV."""
         try:
-            import pandas as pd
+            # Seven fixed rows — stdlib csv avoids pulling in pandas for
+            # users who never touch the bulk invoice export
+            import csv
             import io
 
             # Get statistics
-            stats = self.service_manager.get_statistics()
-            cache_stats = self.service_manager.get_cache_statistics()
+            stats = _cached_statistics(self.service_manager)
+            cache_stats = _cached_cache_statistics(self.service_manager)
 
             # Prepare statistics data
             stats_data = [
@@ -368,20 +371,22 @@ class NavigationComponent:
                 },
                 {
                     "Metric": "System Timestamp",
-                    "Value": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "Value": self._now.strftime("%Y-%m-%d %H:%M:%S"),
                 },
             ]
 
-            # Create DataFrame and CSV
-            df = pd.DataFrame(stats_data)
+            # Write CSV with the stdlib writer
             csv_buffer = io.StringIO()
-            df.to_csv(csv_buffer, index=False)
+            writer = csv.writer(csv_buffer)
+            writer.writerow(["Metric", "Value"])
+            writer.writerows((row["Metric"], row["Value"]) for row in stats_data)
+            csv_bytes = csv_buffer.getvalue().encode("utf-8")
 
             # Provide download
             st.download_button(
                 label="📥 Download Statistics CSV",
-                data=csv_buffer.getvalue(),
-                file_name=f"business_statistics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                data=csv_bytes,
+                file_name=f"business_statistics_{self._now_stamp}.csv",
                 mime="text/csv",
                 key="download_stats_csv_btn",
             )
@@ -402,7 +407,7 @@ class NavigationComponent:
         try:
             # Get system status
             status = self.service_manager.get_service_status()
-            cache_stats = self.service_manager.get_cache_statistics()
+            cache_stats = _cached_cache_statistics(self.service_manager)
 
             # Generate system report
             report_content = self._generate_system_report_text(status, cache_stats)
@@ -411,7 +416,7 @@ class NavigationComponent:
             st.download_button(
                 label="📥 Download System Report",
                 data=report_content,
-                file_name=f"system_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                file_name=f"system_report_{self._now_stamp}.txt",
                 mime="text/plain",
                 key="download_system_btn",
             )
@@ -423,11 +428,12 @@ class NavigationComponent:
 
     def _generate_invoice_report_html(self, invoices, stats):
         """Generate HTML invoice report."""
+        now = datetime.now()
         html = f"""
 <!DOCTYPE html>
 <html>
 <head>
-    <title>Invoice Report - {datetime.now().strftime('%Y-%m-%d')}</title>
+    <title>Invoice Report - {now.strftime('%Y-%m-%d')}</title>
     <style>
         body {{ font-family: Arial, sans-serif; margin: 20px; }}
         .header {{ background: #f0f0f0; padding: 20px; border-radius: 5px; }}
@@ -441,7 +447,7 @@ class NavigationComponent:
 <body>
     <div class="header">
         <h1>📊 Invoice Management Report</h1>
-        <p>Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Generated on: {now.strftime('%Y-%m-%d %H:%M:%S')}</p>
     </div>
     
     <div class="stats">
@@ -470,10 +476,12 @@ class NavigationComponent:
         </tr>
 """
 
+        rows = []
         for invoice in invoices[:50]:  # Limit to 50 for report
             invoice_data = invoice.get("invoice_data", invoice)
             client = invoice_data.get("client", {})
-            html += f"""
+            rows.append(
+                f"""
         <tr>
             <td>{invoice_data.get('invoice_number', 'N/A')}</td>
             <td>{client.get('name', 'N/A')}</td>
@@ -482,30 +490,32 @@ class NavigationComponent:
             <td>{invoice_data.get('status', 'N/A')}</td>
         </tr>
 """
+            )
 
-        html += """
+        footer = """
     </table>
 </body>
 </html>
 """
-        return html
+        return html + "".join(rows) + footer
 
     def _generate_system_report_text(self, status, cache_stats):
         """Generate system status report as text."""
         report = f"""
 SYSTEM STATUS REPORT
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated: {self._now.strftime('%Y-%m-%d %H:%M:%S')}
 {'='*50}
 
 SERVICE STATUS:
 """
 
         services = status.get("services_available", {})
-        for service, available in services.items():
-            status_text = "✅ ONLINE" if available else "❌ OFFLINE"
-            report += f"  {service.upper()}: {status_text}\n"
+        service_lines = [
+            f"  {service.upper()}: {'✅ ONLINE' if available else '❌ OFFLINE'}\n"
+            for service, available in services.items()
+        ]
 
-        report += f"""
+        report += "".join(service_lines) + f"""
 CACHE PERFORMANCE:
   Total Requests: {cache_stats['performance']['total_requests']:,}
   Cache Hits: {cache_stats['performance']['cache_hits']:,}
@@ -515,10 +525,12 @@ CACHE PERFORMANCE:
 CACHE SIZES:
 """
 
-        for cache_type, size in cache_stats.get("cache_sizes", {}).items():
-            report += f"  {cache_type}: {size} items\n"
+        cache_lines = [
+            f"  {cache_type}: {size} items\n"
+            for cache_type, size in cache_stats.get("cache_sizes", {}).items()
+        ]
 
-        report += f"""
+        report += "".join(cache_lines) + f"""
 MEMORY USAGE:
   Total Cached Items: {cache_stats['total_cached_items']}
   Cache Entries: {cache_stats['memory_usage']['cache_entries']}
@@ -528,44 +540,74 @@ END OF REPORT
 """
         return report
 
+    def _get_throttled_stats(self):
+        """Return (stats, cache_stats, formatted), refreshed at most once per 30s.
+
+        Keeps interim sidebar reruns (shortcut clicks, toggles) from
+        touching the backend at all; Refresh Now drops the cached pair.
+        """
+        cached = st.session_state.get("_stats_cache")
+        if (
+            cached is not None
+            and time.time() - st.session_state.get("_stats_ts", 0.0) < 30
+        ):
+            return cached
+
+        stats = _cached_statistics(self.service_manager)
+        cache_stats = _cached_cache_statistics(self.service_manager)
+
+        # Format the metric strings once per refresh window so repaints
+        # do no formatting or threshold branching at all
+        outstanding = stats.get("total_outstanding_amount", 0)
+        hit_rate = cache_stats["performance"]["hit_rate_percent"]
+        formatted = {
+            "total_invoices": stats.get("total_invoices", 0),
+            "invoices_delta": f"+{stats.get('recent_invoices_30_days', 0)} this month",
+            "outstanding": f"${outstanding:,.2f}",
+            "outstanding_delta": "Needs attention" if outstanding > 10000 else "Good",
+            "hit_rate": f"{hit_rate:.1f}%",
+            "hit_rate_delta": "Excellent" if hit_rate > 70 else "Good",
+        }
+
+        cached = (stats, cache_stats, formatted)
+        st.session_state["_stats_cache"] = cached
+        st.session_state["_stats_ts"] = time.time()
+        return cached
+
+    @st.fragment
     def _render_sidebar_stats(self):
         """Render quick statistics in sidebar."""
-        st.markdown("### 📈 Quick Stats")
+        st.markdown("---\n### 📈 Quick Stats")
 
         try:
-            stats = self.service_manager.get_statistics()
+            _, _, formatted = self._get_throttled_stats()
 
-            # Total Invoices
-            total_invoices = stats.get("total_invoices", 0)
             st.metric(
                 "Total Invoices",
-                total_invoices,
-                delta=f"+{stats.get('recent_invoices_30_days', 0)} this month",
+                formatted["total_invoices"],
+                delta=formatted["invoices_delta"],
             )
 
-            # Outstanding Amount
-            outstanding = stats.get("total_outstanding_amount", 0)
             st.metric(
                 "Outstanding",
-                f"${outstanding:,.2f}",
-                delta="Needs attention" if outstanding > 10000 else "Good",
+                formatted["outstanding"],
+                delta=formatted["outstanding_delta"],
             )
 
-            # Cache Performance
-            cache_stats = self.service_manager.get_cache_statistics()
-            hit_rate = cache_stats["performance"]["hit_rate_percent"]
             st.metric(
                 "Cache Performance",
-                f"{hit_rate:.1f}%",
-                delta="Excellent" if hit_rate > 70 else "Good",
+                formatted["hit_rate"],
+                delta=formatted["hit_rate_delta"],
             )
 
         except Exception as e:
             st.error(f"Error loading stats: {str(e)}")
 
+    @st.fragment
     def _render_system_controls(self):
         """Render system control options."""
-        st.markdown("### ⚙️ System Controls")
+        self._refresh_clock()
+        st.markdown("---\n### ⚙️ System Controls")
 
         # Auto-refresh toggle
         st.session_state.auto_refresh = st.toggle(
@@ -580,33 +622,41 @@ END OF REPORT
             self._force_refresh()
 
         # Last refresh time
-        last_refresh = st.session_state.get("last_refresh", datetime.now())
-        time_since_refresh = datetime.now() - last_refresh
+        last_refresh = st.session_state.get("last_refresh", self._now)
+        time_since_refresh = self._now - last_refresh
         minutes_ago = int(time_since_refresh.total_seconds() / 60)
         if minutes_ago == 0:
             st.caption("🕒 Just updated")
         else:
             st.caption(f"🕒 Updated {minutes_ago}m ago")
 
+        # A refresh invalidates data rendered outside this fragment, so
+        # escalate to the app-scoped rerun the other shortcuts use.
+        if st.session_state.pop("_sidebar_needs_app_rerun", False):
+            st.rerun(scope="app")
+
     def _force_refresh(self):
         """Force refresh of all data."""
         # Clear caches
         self.service_manager._clear_cache()
+        _cached_statistics.clear()
+        _cached_cache_statistics.clear()
+        st.session_state.pop("_stats_cache", None)
+        st.session_state.pop("_stats_ts", None)
 
         # Update timestamp
-        st.session_state.last_refresh = datetime.now()
+        st.session_state.last_refresh = self._now
 
         # Add notification
-        if "notification_queue" not in st.session_state:
-            st.session_state.notification_queue = []
-        st.session_state.notification_queue.append(
+        st.session_state.setdefault("notification_queue", []).append(
             {
                 "message": "Data refreshed successfully!",
                 "type": "success",
-                "timestamp": datetime.now(),
+                "timestamp": self._now,
             }
         )
 
-        # Rerun to update display
-        st.rerun()
+        # The stats fragment and main page hold the data just cleared;
+        # flag the fragment body to repaint the whole app.
+        st.session_state._sidebar_needs_app_rerun = True
  
\ No newline at end of file
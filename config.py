@@ -1,31 +1,141 @@
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from typing import Optional
 
-load_dotenv()
+try:
+    from pydantic_settings import BaseSettings, SettingsConfigDict
+
+    PYDANTIC_SETTINGS_AVAILABLE = True
+except ImportError:
+    BaseSettings = object
+    SettingsConfigDict = None
+    PYDANTIC_SETTINGS_AVAILABLE = False
+
+
+if PYDANTIC_SETTINGS_AVAILABLE:
+
+    class AppConfig(BaseSettings):
+        """Typed application settings, loaded and validated once.
+
+        Field names map to the upper-cased environment variables
+        (AZURE_AI_ENDPOINT, COSMOS_KEY, ...) and fall back to the .env
+        file, so deployment configuration is unchanged. Validation runs
+        a single time at startup instead of every consumer re-reading
+        the environment.
+        """
+
+        model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+        # Azure AI Foundry Configuration
+        azure_ai_endpoint: str = "https://jason-m9mz1o12-eastus2.services.ai.azure.com/api/projects/jason-m9mz1o12-eastus2-project"
+        agent_id: str = "asst_cyFkA3Y2cBHJDZxWd0LiGtYP"
+
+        # CosmosDB Configuration
+        cosmos_endpoint: Optional[str] = None
+        cosmos_key: Optional[str] = None
+        cosmos_database_name: str = "InvoiceDB"
+        cosmos_container_name: str = "invoices"
+
+        # Azure Search Configuration
+        search_endpoint: Optional[str] = None
+        search_key: Optional[str] = None
+        search_index_name: str = "invoices-index"
+
+        # Azure Storage Configuration
+        storage_connection_string: Optional[str] = None
+        storage_container_name: str = "invoices"
+
+        # Company Configuration
+        company_name: str = "Professional Services Inc."
+        company_address: str = "123 Business Street, Suite 100, Business City, BC 12345"
+        company_phone: str = "+1 (555) 123-4567"
+        company_email: str = "billing@professionalservices.com"
+        company_website: str = "www.professionalservices.com"
+        company_tax_id: str = "TAX-123456789"
+
+else:
+
+    class AppConfig:
+        """Fallback settings object when pydantic-settings is missing.
+
+        Reads the same environment variables with the same defaults,
+        just without type validation.
+        """
+
+        def __init__(self):
+            try:
+                from dotenv import load_dotenv
+
+                load_dotenv()
+            except ImportError:
+                pass
+
+            self.azure_ai_endpoint = os.getenv(
+                "AZURE_AI_ENDPOINT",
+                "https://jason-m9mz1o12-eastus2.services.ai.azure.com/api/projects/jason-m9mz1o12-eastus2-project",
+            )
+            self.agent_id = os.getenv("AGENT_ID", "asst_cyFkA3Y2cBHJDZxWd0LiGtYP")
+
+            self.cosmos_endpoint = os.getenv("COSMOS_ENDPOINT")
+            self.cosmos_key = os.getenv("COSMOS_KEY")
+            self.cosmos_database_name = os.getenv("COSMOS_DATABASE_NAME", "InvoiceDB")
+            self.cosmos_container_name = os.getenv("COSMOS_CONTAINER_NAME", "invoices")
+
+            self.search_endpoint = os.getenv("SEARCH_ENDPOINT")
+            self.search_key = os.getenv("SEARCH_KEY")
+            self.search_index_name = os.getenv("SEARCH_INDEX_NAME", "invoices-index")
+
+            self.storage_connection_string = os.getenv("STORAGE_CONNECTION_STRING")
+            self.storage_container_name = os.getenv("STORAGE_CONTAINER_NAME", "invoices")
+
+            self.company_name = os.getenv("COMPANY_NAME", "Professional Services Inc.")
+            self.company_address = os.getenv(
+                "COMPANY_ADDRESS",
+                "123 Business Street, Suite 100, Business City, BC 12345",
+            )
+            self.company_phone = os.getenv("COMPANY_PHONE", "+1 (555) 123-4567")
+            self.company_email = os.getenv(
+                "COMPANY_EMAIL", "billing@professionalservices.com"
+            )
+            self.company_website = os.getenv(
+                "COMPANY_WEBSITE", "www.professionalservices.com"
+            )
+            self.company_tax_id = os.getenv("COMPANY_TAX_ID", "TAX-123456789")
+
+
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """Get the singleton application config (built on first call)."""
+    return AppConfig()
+
+
+# Module-level constants kept for existing `import config` consumers;
+# they are views of the singleton, resolved once at import.
+_config = get_config()
 
 # Azure AI Foundry Configuration
-AZURE_AI_ENDPOINT = os.getenv("AZURE_AI_ENDPOINT", "https://jason-m9mz1o12-eastus2.services.ai.azure.com/api/projects/jason-m9mz1o12-eastus2-project")
-AGENT_ID = os.getenv("AGENT_ID", "asst_cyFkA3Y2cBHJDZxWd0LiGtYP")
+AZURE_AI_ENDPOINT = _config.azure_ai_endpoint
+AGENT_ID = _config.agent_id
 
 # CosmosDB Configuration
-COSMOS_ENDPOINT = os.getenv("COSMOS_ENDPOINT")
-COSMOS_KEY = os.getenv("COSMOS_KEY")
-COSMOS_DATABASE_NAME = os.getenv("COSMOS_DATABASE_NAME", "InvoiceDB")
-COSMOS_CONTAINER_NAME = os.getenv("COSMOS_CONTAINER_NAME", "invoices")
+COSMOS_ENDPOINT = _config.cosmos_endpoint
+COSMOS_KEY = _config.cosmos_key
+COSMOS_DATABASE_NAME = _config.cosmos_database_name
+COSMOS_CONTAINER_NAME = _config.cosmos_container_name
 
 # Azure Search Configuration
-SEARCH_ENDPOINT = os.getenv("SEARCH_ENDPOINT")
-SEARCH_KEY = os.getenv("SEARCH_KEY")
-SEARCH_INDEX_NAME = os.getenv("SEARCH_INDEX_NAME", "invoices-index")
+SEARCH_ENDPOINT = _config.search_endpoint
+SEARCH_KEY = _config.search_key
+SEARCH_INDEX_NAME = _config.search_index_name
 
 # Azure Storage Configuration
-STORAGE_CONNECTION_STRING = os.getenv("STORAGE_CONNECTION_STRING")
-STORAGE_CONTAINER_NAME = os.getenv("STORAGE_CONTAINER_NAME", "invoices")
+STORAGE_CONNECTION_STRING = _config.storage_connection_string
+STORAGE_CONTAINER_NAME = _config.storage_container_name
 
 # Company Configuration
-COMPANY_NAME = os.getenv("COMPANY_NAME", "Professional Services Inc.")
-COMPANY_ADDRESS = os.getenv("COMPANY_ADDRESS", "123 Business Street, Suite 100, Business City, BC 12345")
-COMPANY_PHONE = os.getenv("COMPANY_PHONE", "+1 (555) 123-4567")
-COMPANY_EMAIL = os.getenv("COMPANY_EMAIL", "billing@professionalservices.com")
-COMPANY_WEBSITE = os.getenv("COMPANY_WEBSITE", "www.professionalservices.com")
-COMPANY_TAX_ID = os.getenv("COMPANY_TAX_ID", "TAX-123456789") 
\ No newline at end of file
+COMPANY_NAME = _config.company_name
+COMPANY_ADDRESS = _config.company_address
+COMPANY_PHONE = _config.company_phone
+COMPANY_EMAIL = _config.company_email
+COMPANY_WEBSITE = _config.company_website
+COMPANY_TAX_ID = _config.company_tax_id
@@ -304,6 +304,7 @@ class ServiceManager:
         self.cosmos_service = None
         self.search_service = None
         self.ai_project_client = None
+        self.ai_project_client_async = None
         self.blob_service = None
         self.agent = None
 
@@ -908,10 +909,10 @@ class ServiceManager:
                 print(f"CosmosDB save failed: {e}")
                 result["storage_warnings"].append("Failed to save to CosmosDB")
 
-        # Index in Azure Search
+        # Index in Azure Search (buffered: batches round trips across saves)
         if self.services_available["search"] and self.search_service:
             try:
-                result["search_indexed"] = self.search_service.index_invoice(
+                result["search_indexed"] = self.search_service.index_invoice_buffered(
                     invoice_data, None
                 )
             except Exception as e:
@@ -1060,6 +1061,37 @@ class ServiceManager:
         """Get direct access to AI Project client."""
         return self.ai_project_client if self.services_available["ai_project"] else None
 
+    def get_ai_project_client_async(self):
+        """Get the async AI Project client (created lazily on first use).
+
+        The async variant shares the same endpoint and credentials but
+        runs over aiohttp, so coroutine callers can issue many agent
+        calls concurrently on one event loop instead of blocking a
+        thread per call.
+        """
+        if not self.services_available["ai_project"]:
+            return None
+
+        if self.ai_project_client_async is None:
+            try:
+                from azure.ai.projects.aio import (
+                    AIProjectClient as AsyncAIProjectClient,
+                )
+                from azure.identity.aio import (
+                    DefaultAzureCredential as AsyncDefaultAzureCredential,
+                )
+
+                self.ai_project_client_async = AsyncAIProjectClient(
+                    credential=AsyncDefaultAzureCredential(),
+                    endpoint=config.AZURE_AI_ENDPOINT,
+                )
+                print("✅ Async AI Project client ready")
+            except Exception as e:
+                print(f"❌ Failed to initialize async AI Project client: {e}")
+                self.ai_project_client_async = None
+
+        return self.ai_project_client_async
+
     def get_agent(self):
         """Get direct access to AI agent."""
         return self.agent if self.services_available["agent"] else None